@@ -16,19 +16,36 @@ This package contains modular services for voice recognition including:
 All services are designed for production deployment with hardcoded configurations.
 """
 
-from .service_state import ServiceState
-from .service_preprocess import PreprocessService
-from .service_asr import ASRService
-from .service_features import FeatureService
-from .service_enroll import EnrollmentService
-from .service_diarize import DiarizationService
-from .service_align import AlignmentService
-from .service_output import OutputService
-from .service_base64 import Base64Service
-from .service_pipeline import PipelineService
+import importlib
+
+# Services resolve lazily (PEP 562): importing the package stays cheap,
+# and heavy model frameworks load only when their service is first used
+_SERVICE_MODULES = {
+    'ServiceState': '.service_state',
+    'SegmentStore': '.service_segments',
+    'PreprocessService': '.service_preprocess',
+    'ASRService': '.service_asr',
+    'FeatureService': '.service_features',
+    'EnrollmentService': '.service_enroll',
+    'DiarizationService': '.service_diarize',
+    'AlignmentService': '.service_align',
+    'OutputService': '.service_output',
+    'Base64Service': '.service_base64',
+    'PipelineService': '.service_pipeline',
+}
+
+
+def __getattr__(name):
+    module_name = _SERVICE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
 
 __all__ = [
     'ServiceState',
+    'SegmentStore',
     'PreprocessService',
     'ASRService',
     'FeatureService',
@@ -5,9 +5,52 @@ Alignment Service
 Handles audio-text alignment and synchronization.
 """
 
+import numpy as np
+from operator import itemgetter
 from typing import List, Dict, Any, Tuple
 from .service_state import ServiceState
 
+try:
+    from numba import njit, prange
+except Exception:
+    njit = None
+
+_start_time = itemgetter("start_time")
+
+# Above this many segment pairs the broadcast overlap matrix gets
+# memory-heavy (8*N*M bytes); switch to the row-wise Numba kernel
+_BROADCAST_LIMIT = 10_000
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _best_overlap(a_start, a_end, d_start, d_end):
+        """Best-overlapping diarized index per ASR segment, O(N) memory."""
+        n = len(a_start)
+        m = len(d_start)
+        best_idx = np.empty(n, np.int64)
+        best_overlap = np.empty(n, np.float64)
+        for i in prange(n):
+            best = -np.inf
+            bi = 0
+            for j in range(m):
+                v = min(a_end[i], d_end[j]) - max(a_start[i], d_start[j])
+                if v > best:
+                    best = v
+                    bi = j
+            best_idx[i] = bi
+            best_overlap[i] = max(best, 0.0)
+        return best_idx, best_overlap
+else:
+    _best_overlap = None
+
+
+def _sorted_by_start(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return segments ordered by start time, skipping the sort when the
+    input is already ordered (the common case for ASR/diarization output)."""
+    if all(_start_time(segments[i]) <= _start_time(segments[i + 1]) for i in range(len(segments) - 1)):
+        return segments
+    return sorted(segments, key=_start_time)
+
 
 class AlignmentService:
     """Audio-text alignment service."""
@@ -29,38 +72,53 @@ class AlignmentService:
         if not asr_segments or not diarized_segments:
             return []
         
-        # Sort segments by start time
-        asr_segments = sorted(asr_segments, key=lambda x: x["start_time"])
-        diarized_segments = sorted(diarized_segments, key=lambda x: x["start_time"])
-        
+        # Sort segments by start time (no-op when already ordered)
+        asr_segments = _sorted_by_start(asr_segments)
+        diarized_segments = _sorted_by_start(diarized_segments)
+
+        # Project segment bounds into SoA float arrays and compute the full
+        # NxM overlap matrix with broadcasting instead of a Python double loop
+        n_asr = len(asr_segments)
+        n_dia = len(diarized_segments)
+        a_start = np.fromiter((s["start_time"] for s in asr_segments), dtype=np.float64, count=n_asr)
+        a_end = np.fromiter((s["end_time"] for s in asr_segments), dtype=np.float64, count=n_asr)
+        d_start = np.fromiter((s["start_time"] for s in diarized_segments), dtype=np.float64, count=n_dia)
+        d_end = np.fromiter((s["end_time"] for s in diarized_segments), dtype=np.float64, count=n_dia)
+
+        if _best_overlap is not None and n_asr * n_dia > _BROADCAST_LIMIT:
+            # Row-wise kernel: never materializes the N x M matrix
+            best, best_overlaps = _best_overlap(a_start, a_end, d_start, d_end)
+            has_overlap = best_overlaps > 0
+        else:
+            overlap = np.maximum(
+                0.0,
+                np.minimum(a_end[:, None], d_end[None, :]) - np.maximum(a_start[:, None], d_start[None, :])
+            )
+            best = overlap.argmax(axis=1)
+            has_overlap = overlap[np.arange(n_asr), best] > 0
+
         aligned_segments = []
-        
-        for asr_seg in asr_segments:
-            # Find overlapping diarized segments
-            overlapping = []
-            for diarized_seg in diarized_segments:
-                if self._segments_overlap(asr_seg, diarized_seg):
-                    overlap = self._compute_overlap(asr_seg, diarized_seg)
-                    overlapping.append((diarized_seg, overlap))
-            
-            if overlapping:
-                # Sort by overlap amount
-                overlapping.sort(key=lambda x: x[1], reverse=True)
-                best_match = overlapping[0][0]
-                
-                # Create aligned segment
-                aligned_seg = asr_seg.copy()
+
+        for i, asr_seg in enumerate(asr_segments):
+            # Build the output dict directly from the fields we need rather
+            # than copying the whole ASR dict (which may carry word lists)
+            aligned_seg = {
+                "start_time": asr_seg["start_time"],
+                "end_time": asr_seg["end_time"],
+                "duration": asr_seg["duration"],
+                "text": asr_seg["text"],
+                "confidence": asr_seg.get("confidence", 0.0)
+            }
+            if has_overlap[i]:
+                best_match = diarized_segments[best[i]]
                 aligned_seg["speaker"] = best_match.get("clustered_speaker", "Unknown")
                 aligned_seg["embedding"] = best_match.get("embedding")
                 aligned_seg["features"] = best_match.get("features")
-                
-                aligned_segments.append(aligned_seg)
             else:
                 # No overlap found, create segment with unknown speaker
-                aligned_seg = asr_seg.copy()
                 aligned_seg["speaker"] = "Unknown"
-                aligned_segments.append(aligned_seg)
-        
+            aligned_segments.append(aligned_seg)
+
         return aligned_segments
     
     def _segments_overlap(self, seg1: Dict[str, Any], seg2: Dict[str, Any]) -> bool:
@@ -112,31 +170,35 @@ class AlignmentService:
         if not segments:
             return []
         
-        # Sort by start time
-        segments = sorted(segments, key=lambda x: x["start_time"])
-        
+        # Sort by start time (no-op when already ordered)
+        segments = _sorted_by_start(segments)
+
         merged = []
         current = segments[0].copy()
-        
+        current_texts = [current["text"]]
+
         for next_seg in segments[1:]:
             # Check if we can merge
-            if (next_seg["speaker"] == current["speaker"] and 
+            if (next_seg["speaker"] == current["speaker"] and
                 next_seg["start_time"] - current["end_time"] < 0.1 and
                 current["duration"] < min_duration):
-                
-                # Merge segments
+
+                # Merge segments; texts are joined once at flush time
                 current["end_time"] = next_seg["end_time"]
                 current["duration"] = current["end_time"] - current["start_time"]
-                current["text"] = current["text"] + " " + next_seg["text"]
-                
+                current_texts.append(next_seg["text"])
+
             else:
                 # Add current segment and start new one
+                current["text"] = " ".join(current_texts)
                 merged.append(current)
                 current = next_seg.copy()
-        
+                current_texts = [current["text"]]
+
         # Add last segment
+        current["text"] = " ".join(current_texts)
         merged.append(current)
-        
+
         return merged
     
     def validate_alignment(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
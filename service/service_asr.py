@@ -6,7 +6,8 @@ Handles Automatic Speech Recognition using faster-whisper.
 """
 
 import os
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Union
 from .service_state import ServiceState
 
 
@@ -32,26 +33,40 @@ class ASRService:
         except Exception:
             self.model = None
     
-    def transcribe_audio(self, audio_path: str) -> List[Dict[str, Any]]:
+    def transcribe_audio(self, audio: Union[str, np.ndarray], sample_rate: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Transcribe audio file to text with timestamps.
-        
+        Transcribe audio to text with timestamps.
+
         Args:
-            audio_path: Path to audio file
-            
+            audio: Path to audio file, or a decoded mono waveform
+            sample_rate: Sample rate of the waveform (required for ndarray input)
+
         Returns:
             List of transcription segments
         """
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-        
+        if isinstance(audio, np.ndarray):
+            # Feed decoded audio straight to the model, skipping the
+            # file decode pass; faster-whisper expects 16kHz float32 mono
+            if sample_rate is None:
+                raise ValueError("sample_rate is required for ndarray input")
+
+            if sample_rate != 16000:
+                import librosa
+                audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=16000)
+
+            if audio.dtype != np.float32:
+                audio = audio.astype(np.float32)
+
+        elif not os.path.exists(audio):
+            raise FileNotFoundError(f"Audio file not found: {audio}")
+
         if self.model is None:
             raise RuntimeError("ASR model not available")
-        
+
         try:
             # Transcribe with faster-whisper
             segments_result, info = self.model.transcribe(
-                audio_path,
+                audio,
                 word_timestamps=self.asr_config["word_timestamps"],
                 beam_size=self.asr_config["beam_size"]
             )
@@ -75,7 +90,10 @@ class ASRService:
     def transcribe_chunks(self, audio_chunks: List, sample_rate: int) -> List[Dict[str, Any]]:
         """
         Transcribe audio chunks.
-        
+
+        Chunks are concatenated and decoded in a single model pass; there is
+        no per-chunk file I/O left to pipeline against inference.
+
         Args:
             audio_chunks: List of audio chunks
             sample_rate: Sample rate
@@ -85,41 +103,40 @@ class ASRService:
         """
         if self.model is None:
             raise RuntimeError("ASR model not available")
-        
-        all_segments = []
-        current_time = 0.0
-        
-        for i, chunk in enumerate(audio_chunks):
-            try:
-                # Save chunk to temporary file
-                temp_path = self.state.TEMP_DIR / f"chunk_{i}.wav"
-                import soundfile as sf
-                sf.write(str(temp_path), chunk, sample_rate)
-                
-                # Transcribe chunk
-                chunk_segments = self.transcribe_audio(str(temp_path))
-                
-                # Adjust timestamps
-                for segment in chunk_segments:
-                    segment["start_time"] += current_time
-                    segment["end_time"] += current_time
-                    all_segments.append(segment)
-                
-                # Update current time
-                if chunk_segments:
-                    current_time = chunk_segments[-1]["end_time"]
-                else:
-                    current_time += len(chunk) / sample_rate
-                
-                # Clean up temp file
-                temp_path.unlink(missing_ok=True)
-                
-            except Exception:
-                # Continue with next chunk if one fails
-                current_time += len(chunk) / sample_rate
-                continue
-        
-        return all_segments
+
+        if not audio_chunks:
+            return []
+
+        # Concatenate chunks into one contiguous array with short silence
+        # separators, so a single transcribe call replaces N temp-file writes
+        separator_samples = int(0.3 * sample_rate)
+        separator = np.zeros(separator_samples, dtype=np.float32)
+
+        pieces = []
+        chunk_offsets = []  # global sample offset of each chunk
+        offset = 0
+        for chunk in audio_chunks:
+            chunk_offsets.append(offset)
+            pieces.append(np.asarray(chunk, dtype=np.float32))
+            pieces.append(separator)
+            offset += len(chunk) + separator_samples
+
+        big = np.concatenate(pieces)
+
+        # Transcribe the combined audio in one pass via the ndarray path
+        segments = self.transcribe_audio(big, sample_rate=sample_rate)
+
+        # Map timestamps from the padded timeline back to the original
+        # audio by removing the separators accumulated before each chunk
+        chunk_starts = np.array(chunk_offsets, dtype=np.float64) / sample_rate
+
+        for segment in segments:
+            chunk_idx = max(0, int(np.searchsorted(chunk_starts, segment["start_time"], side='right')) - 1)
+            pad_offset = chunk_idx * separator_samples / sample_rate
+            segment["start_time"] -= pad_offset
+            segment["end_time"] -= pad_offset
+
+        return segments
     
     def is_available(self) -> bool:
         """Check if ASR service is available."""
@@ -132,5 +149,6 @@ class ASRService:
             "model_size": self.asr_config["model_size"],
             "device": self.asr_config["device"],
             "compute_type": self.asr_config["compute_type"],
-            "model_loaded": self.model is not None
+            "model_loaded": self.model is not None,
+            "accepts_ndarray": True
         }
@@ -7,11 +7,31 @@ Handles speaker diarization and clustering.
 
 import numpy as np
 import librosa
+import soundfile as sf
+from math import gcd
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Dict, Any
-from sklearn.cluster import AgglomerativeClustering
+from scipy.cluster.hierarchy import linkage, fcluster
+from scipy.signal import resample_poly
+from scipy.spatial.distance import squareform
 from .service_state import ServiceState
 from .service_features import FeatureService
 
+# Optional accelerated clustering backend for long recordings
+try:
+    import faiss
+except Exception:
+    faiss = None
+
+try:
+    import igraph
+except Exception:
+    igraph = None
+
+# Above this many segments the O(N^2) distance matrix dominates; switch to
+# k-NN graph clustering when the optional backend is available
+_KNN_CLUSTER_MIN_SEGMENTS = 500
+
 
 class DiarizationService:
     """Speaker diarization service."""
@@ -31,8 +51,18 @@ class DiarizationService:
         Returns:
             List of segments with speaker labels
         """
-        # Load audio
-        audio, sr = librosa.load(audio_path, sr=16000, mono=True)
+        # Load audio with soundfile + polyphase resampling; librosa.load
+        # stays as a fallback for formats libsndfile cannot open
+        try:
+            audio, sr_in = sf.read(audio_path, dtype='float32', always_2d=False)
+            if audio.ndim > 1:
+                audio = audio.mean(axis=1)
+            if sr_in != 16000:
+                g = gcd(16000, sr_in)
+                audio = resample_poly(audio, 16000 // g, sr_in // g).astype(np.float32)
+            sr = 16000
+        except Exception:
+            audio, sr = librosa.load(audio_path, sr=16000, mono=True)
         
         # Voice activity detection
         voice_segments = self._voice_activity_detection(audio, sr)
@@ -69,53 +99,48 @@ class DiarizationService:
         Returns:
             List of voice segments
         """
-        # Compute energy
+        # Compute frame energy directly with a strided view instead of
+        # librosa.feature.rms; thresholding on mean-square is equivalent to
+        # RMS (sqrt is monotonic) and skips an elementwise sqrt
         frame_length = int(0.025 * sr)  # 25ms frames
         hop_length = int(0.010 * sr)    # 10ms hop
-        
-        energy = librosa.feature.rms(y=audio, frame_length=frame_length, hop_length=hop_length)
-        energy = energy.flatten()
-        
+
+        if len(audio) < frame_length:
+            audio_frames = np.pad(audio, (0, frame_length - len(audio)))
+        else:
+            audio_frames = audio
+        frames = sliding_window_view(audio_frames, frame_length)[::hop_length]
+        mean_square = np.mean(frames * frames, axis=1)
+
         # Threshold-based detection
-        threshold = np.percentile(energy, 30)
-        voice_frames = energy > threshold
-        
-        # Convert to segments
-        segments = []
-        start_frame = None
-        
-        for i, is_voice in enumerate(voice_frames):
-            if is_voice and start_frame is None:
-                start_frame = i
-            elif not is_voice and start_frame is not None:
-                # End of voice segment
-                start_time = start_frame * hop_length / sr
-                end_time = i * hop_length / sr
-                duration = end_time - start_time
-                
-                if duration >= self.state.MIN_SEGMENT_DURATION:
-                    segments.append({
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "duration": duration
-                    })
-                
-                start_frame = None
+        threshold = np.percentile(mean_square, 30)
+        voice_frames = mean_square > threshold
         
-        # Handle last segment
-        if start_frame is not None:
-            start_time = start_frame * hop_length / sr
-            end_time = len(audio) / sr
-            duration = end_time - start_time
-            
-            if duration >= self.state.MIN_SEGMENT_DURATION:
-                segments.append({
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "duration": duration
-                })
-        
-        return segments
+        # Convert to segments with a vectorized boundary scan: pad the frame
+        # mask so run starts/ends appear as +1/-1 transitions in the diff
+        padded = np.concatenate([[False], voice_frames, [False]])
+        transitions = np.diff(padded.astype(np.int8))
+        starts = np.where(transitions == 1)[0]
+        ends = np.where(transitions == -1)[0]
+
+        start_times = starts * hop_length / sr
+        end_times = ends * hop_length / sr
+
+        # A run reaching the final frame extends to the end of the audio
+        if len(ends) > 0 and ends[-1] == len(voice_frames):
+            end_times[-1] = len(audio) / sr
+
+        durations = end_times - start_times
+        keep = durations >= self.state.MIN_SEGMENT_DURATION
+
+        return [
+            {
+                "start_time": float(start_times[i]),
+                "end_time": float(end_times[i]),
+                "duration": float(durations[i])
+            }
+            for i in np.where(keep)[0]
+        ]
     
     def _cluster_speakers(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -139,47 +164,71 @@ class DiarizationService:
                 features_list.append(segment["features"])
         
         features_matrix = np.array(features_list)
-        
+
+        # Subtract the global mean ("average speaker") so cosine distances
+        # reflect speaker-specific variation; this tightens the distance
+        # distribution and stabilizes the cluster-count search
+        features_matrix = features_matrix - features_matrix.mean(axis=0, keepdims=True)
+
+        norms = np.linalg.norm(features_matrix, axis=1, keepdims=True).clip(1e-12)
+        normalized = features_matrix / norms
+
+        # Long recordings: cluster on a k-NN similarity graph instead of the
+        # full O(N^2) distance matrix when the optional backend is available
+        if len(normalized) > _KNN_CLUSTER_MIN_SEGMENTS:
+            knn_labels = self._cluster_knn_graph(normalized)
+            if knn_labels is not None:
+                for i, segment in enumerate(segments):
+                    segment["clustered_speaker"] = f"User{knn_labels[i] + 1}"
+                return segments
+
+        # Precompute the cosine distance matrix once and reuse it for every
+        # candidate cluster count and the silhouette scoring
+        distance_matrix = 1.0 - normalized @ normalized.T
+        np.fill_diagonal(distance_matrix, 0.0)
+
         # Determine number of clusters
         n_clusters = min(len(segments), 10)  # Max 10 speakers
-        
-        # Try different cluster counts
+
+        # Build the hierarchical tree once; every candidate cluster count is
+        # just a different cut of the same linkage matrix
+        try:
+            linkage_matrix = linkage(squareform(distance_matrix, checks=False), method='average')
+        except Exception:
+            linkage_matrix = None
+
+        # Try different cluster counts, keeping the winning cut's labels so
+        # the final assignment needs no extra pass over the tree
         best_n_clusters = 1
         best_silhouette = -1
-        
-        for n in range(1, min(n_clusters + 1, len(segments))):
-            try:
-                clustering = AgglomerativeClustering(
-                    n_clusters=n,
-                    metric='cosine',
-                    linkage='average'
-                )
-                labels = clustering.fit_predict(features_matrix)
-                
-                # Compute silhouette score
-                from sklearn.metrics import silhouette_score
-                silhouette = silhouette_score(features_matrix, labels, metric='cosine')
-                
-                if silhouette > best_silhouette:
-                    best_silhouette = silhouette
-                    best_n_clusters = n
-                    
-            except Exception:
-                continue
-        
+        best_labels = None
+
+        if linkage_matrix is not None:
+            for n in range(2, min(n_clusters + 1, len(segments))):
+                try:
+                    labels = fcluster(linkage_matrix, t=n, criterion='maxclust')
+
+                    # Compute silhouette score
+                    from sklearn.metrics import silhouette_score
+                    silhouette = silhouette_score(distance_matrix, labels, metric='precomputed')
+
+                    if silhouette > best_silhouette:
+                        best_silhouette = silhouette
+                        best_n_clusters = n
+                        best_labels = labels
+
+                except Exception:
+                    continue
+
         # Perform final clustering
         try:
-            final_clustering = AgglomerativeClustering(
-                n_clusters=best_n_clusters,
-                metric='cosine',
-                linkage='average'
-            )
-            final_labels = final_clustering.fit_predict(features_matrix)
-            
-            # Assign labels to segments
+            if best_labels is None:
+                best_labels = fcluster(linkage_matrix, t=best_n_clusters, criterion='maxclust')
+
+            # Assign labels to segments (fcluster labels start at 1)
             for i, segment in enumerate(segments):
-                segment["clustered_speaker"] = f"User{final_labels[i] + 1}"
-                
+                segment["clustered_speaker"] = f"User{best_labels[i]}"
+
         except Exception:
             # Fallback: assign all to User1
             for segment in segments:
@@ -187,6 +236,41 @@ class DiarizationService:
         
         return segments
     
+    def _cluster_knn_graph(self, normalized: np.ndarray) -> np.ndarray:
+        """
+        Cluster L2-normalized features via a FAISS k-NN graph and Leiden
+        community detection.
+
+        Args:
+            normalized: L2-normalized feature matrix
+
+        Returns:
+            Cluster labels (0-based), or None if the backend is unavailable
+        """
+        if faiss is None or igraph is None:
+            return None
+
+        try:
+            x = np.ascontiguousarray(normalized, dtype=np.float32)
+            index = faiss.IndexFlatIP(x.shape[1])
+            index.add(x)
+
+            k = min(15, len(x))
+            sims, neighbors = index.search(x, k)
+
+            # Keep edges above the clustering threshold, dropping self-matches
+            threshold = self.speaker_config["clustering_threshold"]
+            rows = np.repeat(np.arange(len(x)), k)
+            cols = neighbors.ravel()
+            keep = (sims.ravel() >= threshold) & (rows != cols) & (cols >= 0)
+
+            graph = igraph.Graph(n=len(x), edges=list(zip(rows[keep], cols[keep])))
+            membership = graph.community_leiden(objective_function='modularity')
+            return np.asarray(membership.membership)
+
+        except Exception:
+            return None
+
     def get_diarization_info(self) -> Dict[str, Any]:
         """Get diarization service information."""
         return {
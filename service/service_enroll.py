@@ -5,14 +5,88 @@ Enrollment Service
 Handles speaker enrollment and profile management.
 """
 
+import hashlib
+import multiprocessing
 import os
 import numpy as np
+import soundfile as sf
+import soxr
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from scipy.optimize import linear_sum_assignment
 from typing import Dict, List, Optional, Any, Tuple
 from .service_state import ServiceState
 from .service_features import FeatureService
 
 
+def _load_audio_16k(file_path: str) -> Tuple[np.ndarray, int]:
+    """
+    Load an audio file as 16kHz mono float32 via soundfile + soxr, which
+    skips librosa's decoder dispatch; librosa.load remains the fallback for
+    formats libsndfile cannot open.
+
+    Args:
+        file_path: Path to audio file
+
+    Returns:
+        Tuple of (audio, sample_rate)
+    """
+    try:
+        audio, sr = sf.read(file_path, dtype='float32', always_2d=False)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if sr != 16000:
+            audio = soxr.resample(audio, sr, 16000)
+        return audio.astype(np.float32, copy=False), 16000
+    except Exception:
+        import librosa
+        return librosa.load(file_path, sr=16000, mono=True)
+
+# Per-worker feature extractor, created once by the pool initializer so the
+# Resemblyzer encoder is not reloaded for every file
+_worker_feature_service = None
+
+
+def _init_profile_worker():
+    """Load the feature extractor once in each worker process."""
+    global _worker_feature_service
+    _worker_feature_service = FeatureService(ServiceState())
+
+
+def _process_enrollment_speaker(task):
+    """
+    Build one speaker's enrollment vectors from all of their clips.
+
+    Module-level so it is picklable for ProcessPoolExecutor. The clips are
+    embedded together through embed_speaker in a single encoder call rather
+    than one forward pass per file.
+
+    Args:
+        task: Tuple of (speaker_name, list of audio file paths)
+
+    Returns:
+        Tuple of (speaker_name, embedding, feature vectors); embedding is
+        None when the encoder is unavailable or every clip failed to load
+    """
+    speaker_name, file_paths = task
+    try:
+        if _worker_feature_service is None:
+            _init_profile_worker()
+
+        wavs = []
+        for file_path in file_paths:
+            try:
+                wavs.append(_load_audio_16k(file_path)[0])
+            except Exception:
+                continue
+
+        embedding = _worker_feature_service.extract_speaker_embedding(wavs)
+        features = [_worker_feature_service.extract_features(wav, 16000) for wav in wavs]
+        return speaker_name, embedding, features
+    except Exception:
+        return speaker_name, None, []
+
+
 class EnrollmentService:
     """Speaker enrollment service for voice identification."""
     
@@ -22,7 +96,11 @@ class EnrollmentService:
         self.enrollment_profiles = {}
         self.speaker_name_map = {}
         self.enrollment_dir = state.ENROLLMENT_DIR
-        
+
+        # Pre-stacked, normalized enrollment vectors per vector type,
+        # rebuilt whenever profiles are (re)loaded
+        self._enroll_matrices = {}
+
         # Load existing profiles if available
         if self.enrollment_dir.exists():
             self.load_profiles()
@@ -37,11 +115,14 @@ class EnrollmentService:
         if not self.enrollment_dir.exists():
             return {}
         
-        # Find audio files
-        audio_files = []
-        for ext in self.state.SUPPORTED_FORMATS:
-            audio_files.extend(self.enrollment_dir.rglob(f"*{ext}"))
-        
+        # Find audio files in one traversal; per-extension rglob calls
+        # would each restart a full recursive walk
+        extensions = self.state.SUPPORTED_FORMATS
+        audio_files = [
+            path for path in self.enrollment_dir.rglob('*')
+            if path.is_file() and path.suffix.lower() in extensions
+        ]
+
         if not audio_files:
             return {}
         
@@ -59,43 +140,201 @@ class EnrollmentService:
                 speaker_files[speaker_name] = []
             speaker_files[speaker_name].append(audio_file)
         
-        # Process each speaker
+        # Reuse cached profiles where the speaker's files are unchanged;
+        # only cache misses pay the decode + embedding cost
+        cache_keys = {name: self._cache_key(files) for name, files in speaker_files.items()}
+        uncached = []
         for speaker_name, files in speaker_files.items():
-            embeddings = []
-            features = []
-            
-            for audio_file in files:
-                try:
-                    # Load audio
-                    import librosa
-                    audio, sr = librosa.load(str(audio_file), sr=16000, mono=True)
-                    
-                    # Extract features
-                    embedding, feature = self.feature_service.extract_embedding_and_features(audio, sr)
-                    
-                    if embedding is not None:
-                        embeddings.append(embedding)
-                    features.append(feature)
-                    
-                except Exception:
-                    continue
-            
+            cached_profile = self._load_cached_profile(speaker_name, cache_keys[speaker_name])
+            if cached_profile is not None:
+                self.enrollment_profiles[speaker_name] = cached_profile
+            else:
+                uncached.append(speaker_name)
+
+        # Extract vectors for all uncached speakers, fanning out across cores
+        # when there is enough work to amortize process startup; each task
+        # covers one speaker so their clips are embedded in a single batch
+        tasks = [
+            (speaker_name, [str(audio_file) for audio_file in speaker_files[speaker_name]])
+            for speaker_name in uncached
+        ]
+        results = self._extract_profile_vectors(tasks)
+
+        for speaker_name, embedding, features in results:
             # Create profile
             profile = {}
-            if embeddings:
-                avg_embedding = np.mean(embeddings, axis=0)
-                avg_embedding = self.feature_service.normalize_embedding(avg_embedding)
-                profile["embedding"] = avg_embedding.astype(np.float32)
-            
+            if embedding is not None:
+                profile["embedding"] = self.feature_service.normalize_embedding(
+                    embedding.astype(np.float32, copy=False)
+                )
+
             if features:
-                avg_features = np.mean(features, axis=0)
-                avg_features = avg_features / (np.linalg.norm(avg_features) + 1e-8)
-                profile["features"] = avg_features.astype(np.float32)
-            
+                # float32 accumulator: the default float64 upcast would
+                # double memory traffic on an otherwise-float32 pipeline
+                avg_features = np.mean(features, axis=0, dtype=np.float32)
+                profile["features"] = self.feature_service.normalize_embedding(avg_features)
+
             if profile:
                 self.enrollment_profiles[speaker_name] = profile
-        
+                self._save_cached_profile(speaker_name, cache_keys[speaker_name], profile)
+
+        self._build_enrollment_matrices()
+
         return self.enrollment_profiles
+
+    def _cache_key(self, files: List[Path]) -> str:
+        """Content hash over a speaker's clips; editing, adding, or removing
+        any reference file invalidates the cached profile regardless of
+        path or mtime churn."""
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            digest.update(path.name.encode())
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()[:16]
+
+    def _load_cached_profile(self, speaker_name: str, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Load a speaker's cached profile vectors, or None on miss."""
+        cache_path = self.state.get_embed_cache_path(f"{speaker_name}_{key}")
+        if not cache_path.exists():
+            return None
+        try:
+            with np.load(cache_path) as data:
+                return {name: data[name] for name in data.files}
+        except Exception:
+            return None
+
+    def _save_cached_profile(self, speaker_name: str, key: str, profile: Dict[str, np.ndarray]):
+        """Persist a speaker's profile vectors, dropping stale cache entries."""
+        try:
+            cache_path = self.state.get_embed_cache_path(f"{speaker_name}_{key}")
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            for stale in cache_path.parent.glob(f"{speaker_name}_*.npz"):
+                stale.unlink(missing_ok=True)
+            np.savez(cache_path, **profile)
+        except Exception:
+            pass
+
+    def _extract_profile_vectors(self, tasks: List[Tuple[str, List[str]]]) -> List[Tuple[str, Optional[np.ndarray], List[np.ndarray]]]:
+        """
+        Run vector extraction over per-speaker tasks, in parallel when
+        there are several speakers.
+
+        Args:
+            tasks: List of (speaker_name, audio file paths) tuples
+
+        Returns:
+            List of (speaker_name, embedding, feature vectors) results
+        """
+        if len(tasks) > 2:
+            try:
+                max_workers = min(os.cpu_count() or 1, len(tasks))
+                # spawn, not fork: the parent has already initialized CUDA,
+                # and a forked worker cannot re-initialize it — the encoder
+                # would silently come up without its GPU embedding path
+                with ProcessPoolExecutor(max_workers=max_workers,
+                                         initializer=_init_profile_worker,
+                                         mp_context=multiprocessing.get_context("spawn")) as executor:
+                    return list(executor.map(_process_enrollment_speaker, tasks))
+            except Exception:
+                pass  # fall back to in-process extraction
+
+        results = []
+        for speaker_name, file_paths in tasks:
+            wavs = []
+            for file_path in file_paths:
+                try:
+                    wavs.append(_load_audio_16k(file_path)[0])
+                except Exception:
+                    continue
+
+            embedding = self.feature_service.extract_speaker_embedding(wavs)
+            features = [self.feature_service.extract_features(wav, 16000) for wav in wavs]
+            results.append((speaker_name, embedding, features))
+        return results
+
+    def _build_enrollment_matrices(self):
+        """Stack enrollment vectors into normalized per-type matrices so
+        speaker mapping runs as one matrix product instead of nested loops."""
+        self._enroll_matrices = {}
+
+        grouped = {"embedding": ([], []), "features": ([], [])}
+        for name, profile in self.enrollment_profiles.items():
+            if "embedding" in profile:
+                vector_type = "embedding"
+            elif "features" in profile:
+                vector_type = "features"
+            else:
+                continue
+            names, rows = grouped[vector_type]
+            names.append(name)
+            rows.append(profile[vector_type])
+
+        for vector_type, (names, rows) in grouped.items():
+            if not rows:
+                continue
+            try:
+                matrix = np.stack(rows).astype(np.float32)
+                matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(1e-12)
+            except ValueError:
+                # Ragged vector lengths; similarity falls back to per-pair
+                matrix = None
+            self._enroll_matrices[vector_type] = (names, matrix)
+
+    @staticmethod
+    def _batched_centroids(rows: List[np.ndarray], labels: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Per-label mean vectors computed in one reduceat over the
+        label-sorted row stack, instead of one np.mean call per group.
+
+        Args:
+            rows: Vectors, one per segment
+            labels: Speaker label for each row
+
+        Returns:
+            Dictionary mapping each label to its centroid
+        """
+        if not rows:
+            return {}
+
+        uniq, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse, kind='stable')
+        try:
+            sorted_rows = np.stack([rows[i] for i in order]).astype(np.float32, copy=False)
+        except ValueError:
+            # Ragged vector lengths; fall back to per-group means
+            groups = {}
+            for label, row in zip(labels, rows):
+                groups.setdefault(label, []).append(row)
+            return {label: np.mean(group, axis=0, dtype=np.float32) for label, group in groups.items()}
+
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        centroids = np.add.reduceat(sorted_rows, starts, axis=0) / counts[:, None].astype(np.float32)
+        return {str(label): centroids[i] for i, label in enumerate(uniq)}
+
+    def _similarity_matrix(self, cluster_rows, enroll_names, enroll_matrix, vector_type):
+        """Similarities between cluster representatives and enrolled speakers
+        as a (clusters, enrolled) matrix, via one GEMM when shapes allow."""
+        if enroll_matrix is not None:
+            try:
+                cluster_matrix = np.stack(cluster_rows).astype(np.float32)
+                cluster_matrix /= np.linalg.norm(cluster_matrix, axis=1, keepdims=True).clip(1e-12)
+                return cluster_matrix @ enroll_matrix.T
+            except ValueError:
+                pass
+
+        # Per-pair fallback: profiles are stored unit-norm, so only the
+        # cluster side needs normalizing before a plain dot product
+        similarities = np.empty((len(cluster_rows), len(enroll_names)))
+        for i, row in enumerate(cluster_rows):
+            row = np.ravel(row).astype(np.float32, copy=False)
+            row = row / (np.linalg.norm(row) + 1e-12)
+            for j, name in enumerate(enroll_names):
+                similarities[i, j] = self.feature_service.compute_similarity_normalized(
+                    row, self.enrollment_profiles[name][vector_type]
+                )
+        return similarities
     
     def map_speakers(self, segments: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
         """
@@ -109,107 +348,102 @@ class EnrollmentService:
         """
         if not self.enrollment_profiles:
             return segments, {}
-        
+
+        # Profiles set without going through load_profiles still get matrices
+        if not self._enroll_matrices:
+            self._build_enrollment_matrices()
+
+        # Resolve each segment's speaker key once; the fallback chain of
+        # dict probes would otherwise run again in every loop below
+        resolved = [
+            segment.get("speaker") or segment.get("clustered_speaker") or "User1"
+            for segment in segments
+        ]
+
         # Group segments by speaker
         speaker_groups = {}
-        for segment in segments:
-            speaker = segment.get("speaker") or segment.get("clustered_speaker") or "User1"
+        for speaker, segment in zip(resolved, segments):
             if speaker not in speaker_groups:
                 speaker_groups[speaker] = []
             speaker_groups[speaker].append(segment)
-        
-        # Build cluster representatives
+
+        # Build cluster representatives: all centroids of one vector type
+        # come out of a single reduceat over the label-sorted stack
+        embedding_labels, embedding_rows = [], []
+        feature_labels, feature_rows = [], []
+        for speaker, segment in zip(resolved, segments):
+            if "embedding" in segment:
+                embedding_labels.append(speaker)
+                embedding_rows.append(segment["embedding"])
+            if "features" in segment:
+                feature_labels.append(speaker)
+                feature_rows.append(segment["features"])
+
+        embedding_centroids = self._batched_centroids(embedding_rows, embedding_labels)
+        feature_centroids = self._batched_centroids(feature_rows, feature_labels)
+
         cluster_representatives = {}
-        for speaker, group_segments in speaker_groups.items():
-            embeddings = []
-            features = []
-            
-            for segment in group_segments:
-                if "embedding" in segment:
-                    embeddings.append(segment["embedding"])
-                if "features" in segment:
-                    features.append(segment["features"])
-            
-            if embeddings:
+        for speaker in speaker_groups:
+            if speaker in embedding_centroids:
                 cluster_representatives[speaker] = {
-                    "embedding": np.mean(embeddings, axis=0),
+                    "embedding": embedding_centroids[speaker],
                     "type": "embedding"
                 }
-            elif features:
+            elif speaker in feature_centroids:
                 cluster_representatives[speaker] = {
-                    "features": np.mean(features, axis=0),
+                    "features": feature_centroids[speaker],
                     "type": "features"
                 }
         
-        # Prepare enrollment vectors
-        enrollment_vectors = {}
-        for name, profile in self.enrollment_profiles.items():
-            if "embedding" in profile:
-                enrollment_vectors[name] = {
-                    "embedding": profile["embedding"],
-                    "type": "embedding"
-                }
-            elif "features" in profile:
-                enrollment_vectors[name] = {
-                    "features": profile["features"],
-                    "type": "features"
-                }
-        
-        # Perform mapping
+        # Compute all cluster-to-enrollment similarities per vector type in
+        # one matrix product each, instead of per-pair compute_similarity calls
+        cluster_order = {"embedding": [], "features": []}
+        cluster_rows = {"embedding": [], "features": []}
+        for speaker, cluster_data in cluster_representatives.items():
+            vector_type = cluster_data["type"]
+            cluster_order[vector_type].append(speaker)
+            cluster_rows[vector_type].append(cluster_data[vector_type])
+
+        similarity_tables = {}
+        for vector_type in ("embedding", "features"):
+            if not cluster_rows[vector_type] or vector_type not in self._enroll_matrices:
+                continue
+            enroll_names, enroll_matrix = self._enroll_matrices[vector_type]
+            sims = self._similarity_matrix(
+                cluster_rows[vector_type], enroll_names, enroll_matrix, vector_type
+            )
+            similarity_tables[vector_type] = (cluster_order[vector_type], enroll_names, sims)
+
+        # Globally optimal one-to-one mapping per vector type via the
+        # Hungarian algorithm; a greedy largest-cluster-first pass can burn
+        # an enrollment name that a later cluster matched better
         speaker_name_map = {}
-        used_names = set()
-        
-        # Sort clusters by size
-        sorted_clusters = sorted(
-            cluster_representatives.items(),
-            key=lambda x: len(speaker_groups[x[0]]),
-            reverse=True
-        )
-        
-        for cluster_speaker, cluster_data in sorted_clusters:
-            best_match = None
-            best_score = -1
-            
-            for name, enroll_data in enrollment_vectors.items():
-                if name in used_names:
-                    continue
-                
-                if cluster_data["type"] != enroll_data["type"]:
-                    continue
-                
-                # Compute similarity
-                if cluster_data["type"] == "embedding":
-                    similarity = self.feature_service.compute_similarity(
-                        cluster_data["embedding"], enroll_data["embedding"]
-                    )
-                    threshold = self.state.EMBEDDING_THRESHOLD
-                else:
-                    similarity = self.feature_service.compute_similarity(
-                        cluster_data["features"], enroll_data["features"]
-                    )
-                    threshold = self.state.FEATURES_THRESHOLD
-                
-                if similarity > best_score and similarity >= threshold:
-                    best_score = similarity
-                    best_match = name
-            
-            if best_match:
-                speaker_name_map[cluster_speaker] = best_match
-                used_names.add(best_match)
+        for vector_type, (cluster_names, enroll_names, sims) in similarity_tables.items():
+            if vector_type == "embedding":
+                threshold = self.state.EMBEDDING_THRESHOLD
+            else:
+                threshold = self.state.FEATURES_THRESHOLD
+
+            # Below-threshold pairs get a large negative cost so the solver
+            # avoids them; any that still land in the solution are dropped
+            masked = np.where(sims >= threshold, sims, -1e9)
+            row_ind, col_ind = linear_sum_assignment(-masked)
+
+            for r, c in zip(row_ind, col_ind):
+                if sims[r, c] >= threshold:
+                    speaker_name_map[cluster_names[r]] = enroll_names[c]
         
-        # Apply mapping
+        # Apply mapping; segments whose speaker is unchanged are passed
+        # through as-is instead of being copied
         updated_segments = []
-        for segment in segments:
-            updated_segment = segment.copy()
-            speaker = segment.get("speaker") or segment.get("clustered_speaker") or "User1"
-            
-            if speaker in speaker_name_map:
-                updated_segment["speaker"] = speaker_name_map[speaker]
-                if "clustered_speaker" in updated_segment:
-                    updated_segment["clustered_speaker"] = speaker_name_map[speaker]
-            
-            updated_segments.append(updated_segment)
-        
+        for speaker, segment in zip(resolved, segments):
+            mapped_name = speaker_name_map.get(speaker)
+            if mapped_name is not None:
+                segment = dict(segment, speaker=mapped_name)
+                if "clustered_speaker" in segment:
+                    segment["clustered_speaker"] = mapped_name
+            updated_segments.append(segment)
+
         return updated_segments, speaker_name_map
     
     def get_enrollment_info(self) -> Dict[str, Any]:
@@ -230,4 +464,7 @@ class EnrollmentService:
         """Reload enrollment profiles from disk."""
         self.enrollment_profiles.clear()
         self.speaker_name_map.clear()
+        self._enroll_matrices = {}
+        # Cached similarities may reference the profile vectors being replaced
+        self.feature_service.clear_similarity_cache()
         return self.load_profiles()
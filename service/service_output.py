@@ -12,6 +12,14 @@ from pathlib import Path
 from typing import List, Dict, Any
 from datetime import datetime
 from .service_state import ServiceState
+from .service_segments import SegmentStore
+
+# orjson serializes numpy arrays/scalars natively in C; fall back to the
+# stdlib json + recursive conversion when it is unavailable
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 
 class OutputService:
@@ -44,107 +52,183 @@ class OutputService:
         else:
             return obj
     
-    def generate_json_output(self, segments: List[Dict[str, Any]], filename: str = None) -> str:
+    def _compute_stats(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Compute global and per-speaker aggregates in a single pass.
+
+        Args:
+            segments: List of processed segments
+
+        Returns:
+            Stats dict shared by the output generators
+        """
+        if not segments:
+            return {
+                "total_segments": 0,
+                "total_duration": 0.0,
+                "total_words": 0,
+                "speakers": {},
+                "unique_speakers": 0
+            }
+
+        # Column-oriented aggregation: reductions run on contiguous arrays
+        # instead of one dict lookup per segment per field
+        store = SegmentStore.from_list(segments)
+        words = np.fromiter((len(t.split()) for t in store.text), dtype=np.int64, count=len(store))
+
+        unique_speakers, inverse = store.speaker_groups()
+        duration_by_speaker = np.bincount(inverse, weights=store.duration)
+        words_by_speaker = np.bincount(inverse, weights=words)
+        segments_by_speaker = np.bincount(inverse)
+
+        speakers = {
+            str(name): {
+                "duration": float(duration_by_speaker[i]),
+                "words": int(words_by_speaker[i]),
+                "segments": int(segments_by_speaker[i])
+            }
+            for i, name in enumerate(unique_speakers)
+        }
+
+        return {
+            "total_segments": len(segments),
+            "total_duration": float(store.duration.sum()),
+            "total_words": int(words.sum()),
+            "speakers": speakers,
+            "unique_speakers": len(unique_speakers)
+        }
+
+    def generate_json_output(self, segments: List[Dict[str, Any]], filename: str = None, include_vectors: bool = False, stats: Dict[str, Any] = None) -> str:
         """
         Generate JSON output with complete analysis.
-        
+
         Args:
             segments: List of processed segments
             filename: Output filename (without extension)
-            
+            include_vectors: Include raw embedding/features arrays; off by
+                default since they dominate file size and serialization time
+            stats: Precomputed stats from _compute_stats (computed if None)
+
         Returns:
             Path to generated file
         """
         if filename is None:
             filename = f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
+
         output_path = self.output_dir / f"{filename}.json"
-        
+
+        if not include_vectors:
+            segments = [
+                {key: value for key, value in seg.items() if key not in ("embedding", "features")}
+                for seg in segments
+            ]
+
+        if stats is None:
+            stats = self._compute_stats(segments)
+
         # Prepare output data
         output_data = {
             "metadata": {
                 "generated_at": datetime.now().isoformat(),
-                "total_segments": len(segments),
-                "total_duration": sum(seg.get("duration", 0) for seg in segments),
-                "unique_speakers": len(set(seg.get("speaker", "Unknown") for seg in segments))
+                "total_segments": stats["total_segments"],
+                "total_duration": stats["total_duration"],
+                "unique_speakers": stats["unique_speakers"]
             },
             "segments": segments
         }
         
-        # Convert numpy types to Python types for JSON serialization
-        output_data = self._convert_numpy_types(output_data)
-        
-        # Write JSON file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
-        
+        if orjson is not None:
+            # Numpy arrays and scalars serialize in C without a .tolist() pass
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    output_data,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+        else:
+            # Convert numpy types to Python types for JSON serialization
+            output_data = self._convert_numpy_types(output_data)
+
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, ensure_ascii=False)
+
         return str(output_path)
     
-    def generate_text_output(self, segments: List[Dict[str, Any]], filename: str = None) -> str:
+    def generate_text_output(self, segments: List[Dict[str, Any]], filename: str = None, stats: Dict[str, Any] = None, presorted: bool = False) -> str:
         """
         Generate human-readable text output.
-        
+
         Args:
             segments: List of processed segments
             filename: Output filename (without extension)
-            
+            stats: Precomputed stats from _compute_stats (computed if None)
+            presorted: Segments are already ordered by start time
+
         Returns:
             Path to generated file
         """
         if filename is None:
             filename = f"conversation_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
+
         output_path = self.output_dir / f"{filename}.txt"
-        
+
+        if stats is None:
+            stats = self._compute_stats(segments)
+
         # Sort segments by start time
-        sorted_segments = sorted(segments, key=lambda x: x["start_time"])
-        
+        sorted_segments = segments if presorted else sorted(segments, key=lambda x: x["start_time"])
+
+        # Stage the report in memory and flush it with one write call
+        # instead of several small writes per segment
+        parts = [
+            "Voice Recognition Analysis\n",
+            "=" * 50 + "\n\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Total Segments: {stats['total_segments']}\n",
+            f"Total Duration: {stats['total_duration']:.2f}s\n\n",
+            "Conversation:\n",
+            "-" * 30 + "\n\n",
+        ]
+
+        for i, segment in enumerate(sorted_segments):
+            speaker = segment.get("speaker", "Unknown")
+            start_time = segment.get("start_time", 0)
+            end_time = segment.get("end_time", 0)
+            text = segment.get("text", "")
+            confidence = segment.get("confidence", 0)
+
+            parts.append(f"[{i+1:03d}] {start_time:06.2f}s - {end_time:06.2f}s | {speaker}\n")
+            parts.append(f"       {text}\n")
+            if confidence != 0:
+                parts.append(f"       Confidence: {confidence:.3f}\n")
+            parts.append("\n")
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("Voice Recognition Analysis\n")
-            f.write("=" * 50 + "\n\n")
-            
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Segments: {len(segments)}\n")
-            f.write(f"Total Duration: {sum(seg.get('duration', 0) for seg in segments):.2f}s\n\n")
-            
-            f.write("Conversation:\n")
-            f.write("-" * 30 + "\n\n")
-            
-            for i, segment in enumerate(sorted_segments):
-                speaker = segment.get("speaker", "Unknown")
-                start_time = segment.get("start_time", 0)
-                end_time = segment.get("end_time", 0)
-                text = segment.get("text", "")
-                confidence = segment.get("confidence", 0)
-                
-                f.write(f"[{i+1:03d}] {start_time:06.2f}s - {end_time:06.2f}s | {speaker}\n")
-                f.write(f"       {text}\n")
-                if confidence != 0:
-                    f.write(f"       Confidence: {confidence:.3f}\n")
-                f.write("\n")
-        
+            f.write("".join(parts))
+
         return str(output_path)
     
-    def generate_csv_output(self, segments: List[Dict[str, Any]], filename: str = None) -> str:
+    def generate_csv_output(self, segments: List[Dict[str, Any]], filename: str = None, presorted: bool = False) -> str:
         """
         Generate CSV output for analysis.
-        
+
         Args:
             segments: List of processed segments
             filename: Output filename (without extension)
-            
+            presorted: Segments are already ordered by start time
+
         Returns:
             Path to generated file
         """
         if filename is None:
             filename = f"segments_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
+
         output_path = self.output_dir / f"{filename}.csv"
-        
+
         # Sort segments by start time
-        sorted_segments = sorted(segments, key=lambda x: x["start_time"])
+        sorted_segments = segments if presorted else sorted(segments, key=lambda x: x["start_time"])
         
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        # 1 MiB buffer keeps row writes out of the kernel until flush
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
             writer = csv.writer(f)
             
             # Write header
@@ -153,9 +237,9 @@ class OutputService:
                 "Text", "Confidence", "Embedding_Available", "Features_Available"
             ])
             
-            # Write data
-            for i, segment in enumerate(sorted_segments):
-                writer.writerow([
+            # Write data rows in one C-level writerows call
+            writer.writerows(
+                (
                     i + 1,
                     f"{segment.get('start_time', 0):.3f}",
                     f"{segment.get('end_time', 0):.3f}",
@@ -165,71 +249,64 @@ class OutputService:
                     f"{segment.get('confidence', 0):.3f}",
                     "embedding" in segment,
                     "features" in segment
-                ])
+                )
+                for i, segment in enumerate(sorted_segments)
+            )
         
         return str(output_path)
     
-    def generate_summary_report(self, segments: List[Dict[str, Any]], filename: str = None) -> str:
+    def generate_summary_report(self, segments: List[Dict[str, Any]], filename: str = None, stats: Dict[str, Any] = None) -> str:
         """
         Generate summary report.
-        
+
         Args:
             segments: List of processed segments
             filename: Output filename (without extension)
-            
+            stats: Precomputed stats from _compute_stats (computed if None)
+
         Returns:
             Path to generated file
         """
         if filename is None:
             filename = f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
+
         output_path = self.output_dir / f"{filename}.txt"
-        
-        # Calculate statistics
-        total_duration = sum(seg.get("duration", 0) for seg in segments)
-        speakers = {}
-        total_words = 0
-        
-        for segment in segments:
-            speaker = segment.get("speaker", "Unknown")
-            duration = segment.get("duration", 0)
-            text = segment.get("text", "")
-            words = len(text.split())
-            
-            if speaker not in speakers:
-                speakers[speaker] = {"duration": 0, "words": 0, "segments": 0}
-            
-            speakers[speaker]["duration"] += duration
-            speakers[speaker]["words"] += words
-            speakers[speaker]["segments"] += 1
-            total_words += words
-        
+
+        if stats is None:
+            stats = self._compute_stats(segments)
+
+        total_duration = stats["total_duration"]
+        total_words = stats["total_words"]
+        speakers = stats["speakers"]
+
+        # Stage the report in memory and flush it with one write call
+        parts = [
+            "Voice Recognition Summary Report\n",
+            "=" * 40 + "\n\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+            "Overall Statistics:\n",
+            f"  Total Segments: {len(segments)}\n",
+            f"  Total Duration: {total_duration:.2f} seconds\n",
+            f"  Total Words: {total_words}\n",
+            f"  Unique Speakers: {len(speakers)}\n\n",
+            "Speaker Analysis:\n",
+            "-" * 20 + "\n",
+        ]
+
+        # Sort speakers by duration
+        sorted_speakers = sorted(speakers.items(), key=lambda x: x[1]["duration"], reverse=True)
+
+        for speaker, stats in sorted_speakers:
+            percentage = (stats["duration"] / total_duration) * 100 if total_duration > 0 else 0
+            parts.append(f"\n{speaker}:\n")
+            parts.append(f"  Duration: {stats['duration']:.2f}s ({percentage:.1f}%)\n")
+            parts.append(f"  Segments: {stats['segments']}\n")
+            parts.append(f"  Words: {stats['words']}\n")
+            parts.append(f"  Avg Words/Segment: {stats['words']/stats['segments']:.1f}\n")
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("Voice Recognition Summary Report\n")
-            f.write("=" * 40 + "\n\n")
-            
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            f.write("Overall Statistics:\n")
-            f.write(f"  Total Segments: {len(segments)}\n")
-            f.write(f"  Total Duration: {total_duration:.2f} seconds\n")
-            f.write(f"  Total Words: {total_words}\n")
-            f.write(f"  Unique Speakers: {len(speakers)}\n\n")
-            
-            f.write("Speaker Analysis:\n")
-            f.write("-" * 20 + "\n")
-            
-            # Sort speakers by duration
-            sorted_speakers = sorted(speakers.items(), key=lambda x: x[1]["duration"], reverse=True)
-            
-            for speaker, stats in sorted_speakers:
-                percentage = (stats["duration"] / total_duration) * 100 if total_duration > 0 else 0
-                f.write(f"\n{speaker}:\n")
-                f.write(f"  Duration: {stats['duration']:.2f}s ({percentage:.1f}%)\n")
-                f.write(f"  Segments: {stats['segments']}\n")
-                f.write(f"  Words: {stats['words']}\n")
-                f.write(f"  Avg Words/Segment: {stats['words']/stats['segments']:.1f}\n")
-        
+            f.write("".join(parts))
+
         return str(output_path)
     
     def generate_all_outputs(self, segments: List[Dict[str, Any]], base_filename: str = None) -> Dict[str, str]:
@@ -243,13 +320,17 @@ class OutputService:
         Returns:
             Dictionary of output file paths
         """
+        # One stats pass and one sort shared by every generator
+        stats = self._compute_stats(segments)
+        segments = sorted(segments, key=lambda x: x["start_time"])
+
         outputs = {}
-        
-        outputs["json"] = self.generate_json_output(segments, base_filename)
-        outputs["text"] = self.generate_text_output(segments, base_filename)
-        outputs["csv"] = self.generate_csv_output(segments, base_filename)
-        outputs["summary"] = self.generate_summary_report(segments, base_filename)
-        
+
+        outputs["json"] = self.generate_json_output(segments, base_filename, stats=stats)
+        outputs["text"] = self.generate_text_output(segments, base_filename, stats=stats, presorted=True)
+        outputs["csv"] = self.generate_csv_output(segments, base_filename, presorted=True)
+        outputs["summary"] = self.generate_summary_report(segments, base_filename, stats=stats)
+
         return outputs
     
     def get_output_info(self) -> Dict[str, Any]:
@@ -5,7 +5,10 @@ Pipeline Service
 Orchestrates the entire voice recognition pipeline.
 """
 
+import io
 import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from .service_state import ServiceState
@@ -19,6 +22,47 @@ from .service_output import OutputService
 from .service_base64 import Base64Service
 
 
+# Per-worker pipeline, created once by the pool initializer so models are
+# not reloaded for every file in a directory batch
+_worker_pipeline = None
+
+# Output formats that carry speaker labels; a request without any of them
+# needs no diarization or enrollment mapping at all
+_SPEAKER_FORMATS = frozenset({"json", "csv", "summary"})
+
+
+def _total_duration(segments):
+    """Sum segment durations through one float64 buffer; a single NumPy
+    reduction replaces per-element Python float addition."""
+    return float(np.fromiter(
+        (seg.get("duration", 0.0) for seg in segments), np.float64, count=len(segments)
+    ).sum())
+
+
+def _init_pipeline_worker():
+    """Build the full pipeline once in each worker process."""
+    global _worker_pipeline
+    _worker_pipeline = PipelineService(ServiceState())
+
+
+def _process_file_task(task):
+    """
+    Process one audio file in a worker process.
+
+    Module-level so it is picklable for ProcessPoolExecutor.
+
+    Args:
+        task: Tuple of (audio file path, output formats)
+
+    Returns:
+        Pipeline results for the file
+    """
+    audio_path, output_formats = task
+    if _worker_pipeline is None:
+        _init_pipeline_worker()
+    return _worker_pipeline.process_audio(audio_path, output_formats)
+
+
 class PipelineService:
     """Main pipeline service that coordinates all processing steps."""
     
@@ -64,60 +108,178 @@ class PipelineService:
             audio = self.preprocess.apply_preprocessing(audio, sr)
             
             results["processing_info"]["audio"] = audio_info
-            
-            # Step 2: Perform ASR
-            asr_segments = self.asr.transcribe_audio(audio_path)
+
+            # Transcript-only requests (txt) skip diarization entirely;
+            # speaker labels only surface in json/csv/summary outputs
+            needs_speakers = bool(_SPEAKER_FORMATS & set(output_formats))
+
+            if needs_speakers:
+                # Steps 2-3: ASR and diarization share no state, so they run
+                # concurrently and wall time is max(asr, diar), not the sum
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    asr_future = executor.submit(self.asr.transcribe_audio, audio_path)
+                    diarize_future = executor.submit(self.diarization.perform_diarization, audio_path)
+                    asr_segments = asr_future.result()
+                    diarized_segments = diarize_future.result()
+            else:
+                asr_segments = self.asr.transcribe_audio(audio_path)
+                diarized_segments = []
+
             results["processing_info"]["asr"] = {
                 "segments": len(asr_segments),
-                "total_duration": sum(seg.get("duration", 0) for seg in asr_segments)
+                "total_duration": _total_duration(asr_segments)
             }
-            
-            # Step 3: Perform diarization
-            diarized_segments = self.diarization.perform_diarization(audio_path)
             results["processing_info"]["diarization"] = {
                 "segments": len(diarized_segments),
-                "speakers_detected": len(set(seg.get("clustered_speaker", "Unknown") for seg in diarized_segments))
+                "speakers_detected": len(set(seg.get("clustered_speaker", "Unknown") for seg in diarized_segments)),
+                "skipped": not needs_speakers
             }
-            
+
+
+            # Steps 4-7: shared analysis and output generation
+            self._run_analysis(results, asr_segments, diarized_segments,
+                               Path(audio_path).stem, output_formats, needs_speakers)
+
+        except Exception as e:
+            results["errors"].append(str(e))
+            results["success"] = False
+
+        return results
+
+    def _run_analysis(self, results: Dict[str, Any], asr_segments: List[Dict[str, Any]],
+                      diarized_segments: List[Dict[str, Any]], base_filename: str,
+                      output_formats: List[str], needs_speakers: bool = True):
+        """
+        Run alignment, speaker mapping, merging, and output generation.
+
+        Shared tail of the pipeline for both file and in-memory inputs;
+        mutates results in place. With needs_speakers False, alignment
+        and enrollment mapping are bypassed and the transcript carries a
+        constant speaker label.
+        """
+        if needs_speakers:
             # Step 4: Align ASR and diarization
             aligned_segments = self.alignment.align_segments(asr_segments, diarized_segments)
-            
-            # Step 5: Apply speaker enrollment mapping
-            if self.enrollment.is_enrollment_available():
-                mapped_segments, speaker_mapping = self.enrollment.map_speakers(aligned_segments)
-                results["processing_info"]["enrollment"] = {
-                    "profiles_loaded": len(self.enrollment.enrollment_profiles),
-                    "speaker_mapping": speaker_mapping
+        else:
+            aligned_segments = [
+                {
+                    "start_time": seg["start_time"],
+                    "end_time": seg["end_time"],
+                    "duration": seg["duration"],
+                    "text": seg["text"],
+                    "confidence": seg.get("confidence", 0.0),
+                    "speaker": "Speaker"
                 }
+                for seg in asr_segments
+            ]
+
+        # Step 5: Apply speaker enrollment mapping
+        if needs_speakers and self.enrollment.is_enrollment_available():
+            mapped_segments, speaker_mapping = self.enrollment.map_speakers(aligned_segments)
+            results["processing_info"]["enrollment"] = {
+                "profiles_loaded": len(self.enrollment.enrollment_profiles),
+                "speaker_mapping": speaker_mapping
+            }
+        else:
+            mapped_segments = aligned_segments
+            results["processing_info"]["enrollment"] = {"profiles_loaded": 0}
+
+        # Step 6: Merge short segments
+        final_segments = self.alignment.merge_short_segments(mapped_segments)
+
+        # Step 7: Generate outputs
+        outputs = self.output.generate_all_outputs(final_segments, base_filename)
+
+        # Filter requested formats
+        for format_name in output_formats:
+            if format_name in outputs:
+                results["outputs"][format_name] = outputs[format_name]
+
+        results["success"] = True
+        results["processing_info"]["final"] = {
+            "segments": len(final_segments),
+            "unique_speakers": len(set(seg.get("speaker", "Unknown") for seg in final_segments)),
+            "total_duration": _total_duration(final_segments)
+        }
+
+    def _process_audio_buffer(self, audio_bytes: bytes, audio_format: str,
+                              output_formats: List[str], input_label: str) -> Dict[str, Any]:
+        """
+        Run the pipeline on decoded audio bytes without a temp file.
+
+        Formats libsndfile cannot read in memory (mp3/m4a) are spilled to
+        a temp file and processed through the file path.
+
+        Args:
+            audio_bytes: Decoded audio bytes
+            audio_format: Audio format extension for the spill file
+            output_formats: List of output formats
+            input_label: Label recorded as the input source
+
+        Returns:
+            Pipeline results
+        """
+        if output_formats is None:
+            output_formats = ["json", "txt", "csv", "summary"]
+
+        try:
+            audio, sr = self.preprocess.load_audio_bytes(audio_bytes)
+        except ValueError:
+            # Needs an external decoder; fall back to the temp-file path
+            audio_file = self.base64.write_temp_audio(audio_bytes, audio_format)
+            results = self.process_audio(audio_file, output_formats)
+            results["temp_audio_file"] = audio_file
+            return results
+
+        results = {
+            "input_file": input_label,
+            "success": False,
+            "outputs": {},
+            "errors": [],
+            "processing_info": {}
+        }
+
+        try:
+            # Step 1: Preprocess (validation stats only; ASR and
+            # diarization consume the same in-memory audio)
+            audio_info = self.preprocess.validate_audio(audio, sr)
+            self.preprocess.apply_preprocessing(audio, sr)
+            results["processing_info"]["audio"] = audio_info
+
+            needs_speakers = bool(_SPEAKER_FORMATS & set(output_formats))
+
+            if needs_speakers:
+                # Steps 2-3: ASR from the decoded waveform and diarization
+                # from the in-memory container, overlapped on two threads
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    asr_future = executor.submit(self.asr.transcribe_audio, audio, sample_rate=sr)
+                    diarize_future = executor.submit(self.diarization.perform_diarization, io.BytesIO(audio_bytes))
+                    asr_segments = asr_future.result()
+                    diarized_segments = diarize_future.result()
             else:
-                mapped_segments = aligned_segments
-                results["processing_info"]["enrollment"] = {"profiles_loaded": 0}
-            
-            # Step 6: Merge short segments
-            final_segments = self.alignment.merge_short_segments(mapped_segments)
-            
-            # Step 7: Generate outputs
-            base_filename = Path(audio_path).stem
-            outputs = self.output.generate_all_outputs(final_segments, base_filename)
-            
-            # Filter requested formats
-            for format_name in output_formats:
-                if format_name in outputs:
-                    results["outputs"][format_name] = outputs[format_name]
-            
-            results["success"] = True
-            results["processing_info"]["final"] = {
-                "segments": len(final_segments),
-                "unique_speakers": len(set(seg.get("speaker", "Unknown") for seg in final_segments)),
-                "total_duration": sum(seg.get("duration", 0) for seg in final_segments)
+                asr_segments = self.asr.transcribe_audio(audio, sample_rate=sr)
+                diarized_segments = []
+
+            results["processing_info"]["asr"] = {
+                "segments": len(asr_segments),
+                "total_duration": _total_duration(asr_segments)
             }
-            
+            results["processing_info"]["diarization"] = {
+                "segments": len(diarized_segments),
+                "speakers_detected": len(set(seg.get("clustered_speaker", "Unknown") for seg in diarized_segments)),
+                "skipped": not needs_speakers
+            }
+
+            # Steps 4-7: shared analysis and output generation
+            self._run_analysis(results, asr_segments, diarized_segments,
+                               input_label, output_formats, needs_speakers)
+
         except Exception as e:
             results["errors"].append(str(e))
             results["success"] = False
-        
+
         return results
-    
+
     def process_base64(self, base64_string: str, audio_format: str = "wav", output_formats: List[str] = None) -> Dict[str, Any]:
         """
         Process Base64 encoded audio through the pipeline.
@@ -131,18 +293,17 @@ class PipelineService:
             Pipeline results
         """
         try:
-            # Decode Base64 to audio file
-            audio_file = self.base64.decode_base64_audio(base64_string, audio_format)
-            
-            # Process the audio file
-            results = self.process_audio(audio_file, output_formats)
-            
-            # Add Base64 info
-            results["base64_info"] = self.base64.get_base64_info(base64_string)
-            results["temp_audio_file"] = audio_file
-            
+            # Decode Base64 in memory; the pipeline only spills to a temp
+            # file when the container needs an external decoder
+            audio_bytes = self.base64.decode_base64_bytes(base64_string)
+
+            results = self._process_audio_buffer(audio_bytes, audio_format, output_formats, "base64_input")
+
+            # Add Base64 info from the already-decoded bytes
+            results["base64_info"] = self.base64.describe_bytes(audio_bytes, len(base64_string))
+
             return results
-            
+
         except Exception as e:
             return {
                 "success": False,
@@ -196,12 +357,11 @@ class PipelineService:
             Pipeline results
         """
         try:
-            # Decode chunks to a temp audio file
-            audio_file = self.base64.decode_base64_stream(base64_chunks, audio_format)
-            
-            # Process the audio file
-            results = self.process_audio(audio_file, output_formats)
-            results["temp_audio_file"] = audio_file
+            # Decode chunks into a bounded in-memory buffer instead of a
+            # temp file that process_audio would immediately read back
+            audio_bytes = self.base64.decode_base64_bytes(base64_chunks)
+
+            results = self._process_audio_buffer(audio_bytes, audio_format, output_formats, "base64_chunks")
             results["input_type"] = "base64_chunks"
             return results
         except Exception as e:
@@ -234,35 +394,89 @@ class PipelineService:
             "errors": []
         }
         
-        # Find audio files
+        # Find audio files in one scandir pass; a glob per supported
+        # extension would stat the whole directory once per format
+        extensions = self.state.SUPPORTED_FORMATS
         audio_files = []
-        for ext in self.state.SUPPORTED_FORMATS:
-            audio_files.extend(Path(directory_path).glob(f"*{ext}"))
-        
+        with os.scandir(directory_path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and os.path.splitext(entry.name)[1].lower() in extensions:
+                    audio_files.append(Path(entry.path))
+
         if not audio_files:
             results["errors"].append("No audio files found in directory")
             results["success"] = False
             return results
         
+        # Files are independent, so fan out across cores; on GPU the model
+        # serializes inference anyway, so stay single-process there
+        if self.state.is_gpu_available():
+            workers = 1
+        else:
+            workers = min(max(1, (os.cpu_count() or 2) // 2), len(audio_files))
+
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_pipeline_worker) as executor:
+                    futures = {
+                        executor.submit(_process_file_task, (str(audio_file), output_formats)): audio_file
+                        for audio_file in audio_files
+                    }
+                    for future in as_completed(futures):
+                        audio_file = futures[future]
+                        try:
+                            self._record_file_result(results, future.result())
+                        except Exception as e:
+                            results["files_failed"] += 1
+                            results["errors"].append(f"Failed to process {audio_file}: {e}")
+                return results
+            except Exception:
+                pass  # fall back to serial processing
+
         # Process each file
         for audio_file in audio_files:
             try:
-                file_result = self.process_audio(str(audio_file), output_formats)
-                results["results"].append(file_result)
-                
-                if file_result["success"]:
-                    results["files_processed"] += 1
-                else:
-                    results["files_failed"] += 1
-                    
+                self._record_file_result(results, self.process_audio(str(audio_file), output_formats))
             except Exception as e:
                 results["files_failed"] += 1
                 results["errors"].append(f"Failed to process {audio_file}: {e}")
-        
+
         return results
+
+    @staticmethod
+    def _record_file_result(results: Dict[str, Any], file_result: Dict[str, Any]):
+        """Fold one file's pipeline result into the directory totals."""
+        results["results"].append(file_result)
+        if file_result["success"]:
+            results["files_processed"] += 1
+        else:
+            results["files_failed"] += 1
     
-    def get_pipeline_info(self) -> Dict[str, Any]:
-        """Get pipeline service information."""
+    def get_pipeline_info(self, light: bool = False) -> Dict[str, Any]:
+        """
+        Get pipeline service information.
+
+        Args:
+            light: When True, report only in-memory flags (model loaded,
+                encoder available, profile count) and skip the probes
+                that touch the filesystem
+
+        Returns:
+            Pipeline service information
+        """
+        if light:
+            return {
+                "services": {
+                    "asr": {"model_loaded": self.asr.model is not None},
+                    "features": {"resemblyzer_available": self.features.is_encoder_available()},
+                    "enrollment": {"profiles_loaded": len(self.enrollment.enrollment_profiles)}
+                },
+                "state": {
+                    "gpu_available": self.state.is_gpu_available(),
+                    "device": self.state.DEVICE,
+                    "compute_type": self.state.COMPUTE_TYPE
+                }
+            }
         return {
             "services": {
                 "preprocess": self.preprocess.get_audio_info("test") if hasattr(self.preprocess, 'get_audio_info') else "Available",
@@ -287,9 +501,15 @@ class PipelineService:
             # Clean up Base64 temp files
             self.base64.cleanup_temp_files()
             
-            # Clean up other temp files
-            for temp_file in self.state.TEMP_DIR.glob("*"):
-                if temp_file.is_file():
-                    temp_file.unlink(missing_ok=True)
+            # Clean up other temp files; scandir reuses the directory
+            # entry's type info, so each file costs one unlink syscall
+            # instead of a Path build plus stat
+            with os.scandir(self.state.TEMP_DIR) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        try:
+                            os.unlink(entry.path)
+                        except FileNotFoundError:
+                            pass
         except Exception:
             pass
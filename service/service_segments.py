@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Segment Store
+
+Structure-of-arrays container for segment collections, so batch operations
+(statistics, centroid computation, similarity) run on contiguous NumPy
+columns instead of per-dict lookups.
+"""
+
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+
+class SegmentStore:
+    """Columnar view over a list of segment dicts."""
+
+    def __init__(self, start_time: np.ndarray, end_time: np.ndarray, duration: np.ndarray,
+                 speaker: np.ndarray, text: np.ndarray, confidence: np.ndarray,
+                 embeddings: Optional[np.ndarray] = None, features: Optional[np.ndarray] = None):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.duration = duration
+        self.speaker = speaker
+        self.text = text
+        self.confidence = confidence
+        self.embeddings = embeddings
+        self.features = features
+
+    def __len__(self) -> int:
+        return len(self.start_time)
+
+    @classmethod
+    def from_list(cls, segments: List[Dict[str, Any]]) -> "SegmentStore":
+        """
+        Build a store from segment dicts.
+
+        Vector columns (embeddings/features) are stacked only when every
+        segment carries a vector of the same length; otherwise they stay None
+        and callers fall back to per-dict access.
+
+        Args:
+            segments: List of segment dicts
+
+        Returns:
+            SegmentStore with one column per field
+        """
+        n = len(segments)
+        start_time = np.fromiter((s.get("start_time", 0.0) for s in segments), dtype=np.float64, count=n)
+        end_time = np.fromiter((s.get("end_time", 0.0) for s in segments), dtype=np.float64, count=n)
+        duration = np.fromiter((s.get("duration", 0.0) for s in segments), dtype=np.float64, count=n)
+        confidence = np.fromiter((s.get("confidence", 0.0) for s in segments), dtype=np.float64, count=n)
+        speaker = np.array(
+            [s.get("speaker") or s.get("clustered_speaker") or "Unknown" for s in segments],
+            dtype=object
+        )
+        text = np.array([s.get("text", "") for s in segments], dtype=object)
+
+        return cls(
+            start_time, end_time, duration, speaker, text, confidence,
+            embeddings=cls._stack_vectors(segments, "embedding"),
+            features=cls._stack_vectors(segments, "features")
+        )
+
+    @staticmethod
+    def _stack_vectors(segments: List[Dict[str, Any]], key: str) -> Optional[np.ndarray]:
+        """Stack a per-segment vector field into an (N, D) matrix, or None
+        when any segment lacks it or lengths are ragged."""
+        vectors = [s.get(key) for s in segments]
+        if not vectors or any(v is None for v in vectors):
+            return None
+        try:
+            return np.stack([np.ravel(v) for v in vectors]).astype(np.float32)
+        except ValueError:
+            return None
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Rebuild the list-of-dicts representation."""
+        segments = []
+        for i in range(len(self)):
+            segment = {
+                "start_time": float(self.start_time[i]),
+                "end_time": float(self.end_time[i]),
+                "duration": float(self.duration[i]),
+                "speaker": self.speaker[i],
+                "text": self.text[i],
+                "confidence": float(self.confidence[i])
+            }
+            if self.embeddings is not None:
+                segment["embedding"] = self.embeddings[i]
+            if self.features is not None:
+                segment["features"] = self.features[i]
+            segments.append(segment)
+        return segments
+
+    def speaker_groups(self):
+        """
+        Unique speakers with their segment indices.
+
+        Returns:
+            Tuple of (unique_speakers, inverse_indices) as from np.unique
+        """
+        return np.unique(self.speaker.astype(str), return_inverse=True)
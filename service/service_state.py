@@ -7,17 +7,30 @@ Manages global state, configuration, and shared resources across all services.
 
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+import numpy as np
 import torch
 
 
+class AudioConfig(NamedTuple):
+    """Immutable audio settings; attribute reads are C-level slot lookups
+    instead of per-call dict hashing in the preprocessing hot paths."""
+    target_sample_rate: int
+    supported_formats: Tuple[str, ...]
+    chunk_duration: float
+    min_segment_duration: float
+    max_segment_duration: float
+
+
 class ServiceState:
     """Global service state and configuration manager."""
     
     def __init__(self):
         # Audio processing settings
         self.TARGET_SAMPLE_RATE = 16000  # Hz - standard for voice recognition
-        self.SUPPORTED_FORMATS = ['.wav', '.mp3', '.flac', '.m4a', '.ogg', '.m4b', '.aac']
+        # frozenset: membership tests in directory scans are O(1) and the
+        # set is never rebuilt per call
+        self.SUPPORTED_FORMATS = frozenset({'.wav', '.mp3', '.flac', '.m4a', '.ogg', '.m4b', '.aac'})
         self.CHUNK_DURATION = 3.0  # seconds - audio chunk size
         
         # ASR settings
@@ -37,33 +50,51 @@ class ServiceState:
         self.TEMP_DIR = Path("temp")
         self.MODEL_CACHE = Path("temp_speechbrain")
         self.ENROLLMENT_DIR = Path("Reference")
+        self.EMBED_CACHE = self.MODEL_CACHE / "embeds"
         
         # Device settings
         self.DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
         self.COMPUTE_TYPE = "float16" if self.DEVICE == "cuda" else "int8"
+
+        # Pay CUDA context creation (~1-2s) here, once, instead of at the
+        # first model call; TF32 matmuls are fine for this workload
+        if self.DEVICE == "cuda":
+            try:
+                torch.cuda.init()
+                torch.set_float32_matmul_precision('high')
+            except Exception:
+                pass
         
         # Processing limits
         self.MAX_AUDIO_DURATION = 3600  # seconds - maximum audio length
         self.MIN_SEGMENT_DURATION = 0.5  # seconds - minimum segment length
         self.MAX_SEGMENT_DURATION = 30.0  # seconds - maximum segment length
         
+        # Frozen view of the audio settings for hot-path attribute access
+        self.audio_cfg = AudioConfig(
+            target_sample_rate=self.TARGET_SAMPLE_RATE,
+            supported_formats=tuple(sorted(self.SUPPORTED_FORMATS)),
+            chunk_duration=self.CHUNK_DURATION,
+            min_segment_duration=self.MIN_SEGMENT_DURATION,
+            max_segment_duration=self.MAX_SEGMENT_DURATION
+        )
+
+        # Reusable audio scratch buffer, allocated lazily on first use
+        self._scratch: Optional[np.ndarray] = None
+
         # Initialize directories
         self._setup_directories()
     
     def _setup_directories(self):
         """Create necessary directories if they don't exist."""
-        for directory in [self.OUTPUT_DIR, self.TEMP_DIR, self.MODEL_CACHE]:
+        for directory in [self.OUTPUT_DIR, self.TEMP_DIR, self.MODEL_CACHE, self.EMBED_CACHE]:
             directory.mkdir(exist_ok=True)
     
     def get_audio_config(self) -> Dict[str, Any]:
         """Get audio processing configuration."""
-        return {
-            "target_sample_rate": self.TARGET_SAMPLE_RATE,
-            "supported_formats": self.SUPPORTED_FORMATS,
-            "chunk_duration": self.CHUNK_DURATION,
-            "min_segment_duration": self.MIN_SEGMENT_DURATION,
-            "max_segment_duration": self.MAX_SEGMENT_DURATION
-        }
+        config = self.audio_cfg._asdict()
+        config["supported_formats"] = self.SUPPORTED_FORMATS
+        return config
     
     def get_asr_config(self) -> Dict[str, Any]:
         """Get ASR configuration."""
@@ -94,6 +125,24 @@ class ServiceState:
             "enrollment": self.ENROLLMENT_DIR
         }
     
+    def get_scratch(self, samples: int):
+        """
+        Return a float32 scratch view of the given length, or None when it
+        exceeds the supported maximum.
+
+        One MAX_AUDIO_DURATION-sized buffer is allocated on first use and
+        handed out as zero-copy views, so repeated file loads reuse the
+        same pages instead of allocating (and faulting in) a fresh
+        multi-hundred-MB array per file. State objects are per-process, so
+        callers in the same process must not hold two live views at once.
+        """
+        capacity = self.MAX_AUDIO_DURATION * self.TARGET_SAMPLE_RATE
+        if samples > capacity:
+            return None
+        if self._scratch is None:
+            self._scratch = np.empty(capacity, dtype=np.float32)
+        return self._scratch[:samples]
+
     def is_gpu_available(self) -> bool:
         """Check if GPU is available."""
         return self.DEVICE == "cuda"
@@ -101,6 +150,10 @@ class ServiceState:
     def get_model_cache_path(self) -> Path:
         """Get model cache directory path."""
         return self.MODEL_CACHE
+
+    def get_embed_cache_path(self, key: str) -> Path:
+        """Get the cache file path for an embedding cache key."""
+        return self.EMBED_CACHE / f"{key}.npz"
     
     def get_output_path(self) -> Path:
         """Get output directory path."""
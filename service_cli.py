@@ -8,9 +8,98 @@ Command-line interface for the voice recognition system.
 import argparse
 import sys
 import os
+import threading
+from multiprocessing.connection import Listener, Client
 from pathlib import Path
 from service import PipelineService, ServiceState
 
+# Unix socket used by --daemon; regular invocations proxy through it when
+# it exists so model loading is paid once, not per CLI call
+DEFAULT_SOCKET = "/tmp/voice_recognition.sock"
+
+
+def run_daemon(state: ServiceState, socket_path: str):
+    """
+    Serve processing requests over a Unix socket with warm models.
+
+    The pipeline (Whisper, diarization, embedding encoder) is built once;
+    each request is a dict with a "command" key ("process_audio",
+    "process_directory", "ping" or "shutdown"). Calls are serialized with
+    a lock so concurrent clients cannot interleave GPU work.
+    """
+    pipeline = PipelineService(state)
+    lock = threading.RLock()
+
+    # Replace any stale socket left by a previous daemon
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+
+    with Listener(socket_path, family="AF_UNIX") as listener:
+        # recv() unpickles whatever a connecting peer sends, so the socket
+        # must not be reachable by other local users; restrict it to the
+        # daemon's owner before accepting the first connection
+        os.chmod(socket_path, 0o600)
+        print(f"Daemon listening on {socket_path} (models warm)")
+        running = True
+        while running:
+            with listener.accept() as conn:
+                try:
+                    while True:
+                        msg = conn.recv()
+                        command = msg.get("command")
+                        if command == "shutdown":
+                            conn.send({"success": True, "shutdown": True})
+                            running = False
+                            break
+                        if command == "ping":
+                            conn.send({"success": True, "pong": True})
+                            continue
+                        with lock:
+                            if command == "process_audio":
+                                results = pipeline.process_audio(msg["path"], msg["formats"])
+                            elif command == "process_directory":
+                                results = pipeline.process_directory(msg["path"], msg["formats"])
+                            else:
+                                results = {"success": False, "errors": [f"Unknown command: {command}"]}
+                        conn.send(results)
+                except EOFError:
+                    pass
+                except Exception as e:
+                    try:
+                        conn.send({"success": False, "errors": [str(e)]})
+                    except Exception:
+                        pass
+
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+    pipeline.cleanup()
+
+
+def dispatch_remote(socket_path: str, msg: dict):
+    """
+    Send one request to a running daemon and return its results.
+
+    Args:
+        socket_path: Daemon Unix socket path
+        msg: Request dict with "command" and its arguments
+
+    Returns:
+        Results dict from the daemon, or None when no daemon answered
+        (caller falls back to in-process execution)
+    """
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        with Client(socket_path, family="AF_UNIX") as conn:
+            conn.send(msg)
+            return conn.recv()
+    except (ConnectionRefusedError, FileNotFoundError, EOFError, OSError):
+        return None
+
 
 def main():
     """Main CLI function."""
@@ -60,14 +149,26 @@ Examples:
         "--base64-file",
         help="Process audio from a text file containing Base64 encoded data"
     )
-    
+    input_group.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run as a persistent daemon keeping models warm; later CLI calls proxy through it"
+    )
+
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET,
+        help=f"Daemon socket path (default: {DEFAULT_SOCKET})"
+    )
+
     # Output options
     parser.add_argument(
         "--formats",
         nargs="+",
         choices=["json", "txt", "csv", "summary"],
         default=["json", "txt", "csv", "summary"],
-        help="Output formats to generate (default: all)"
+        help="Output formats to generate (default: all). Requesting only "
+             "txt skips speaker diarization for a plain transcript"
     )
     
     parser.add_argument(
@@ -123,18 +224,39 @@ Examples:
         if args.model_size:
             state.DEFAULT_MODEL_SIZE = args.model_size
         
-        # Initialize pipeline
-        pipeline = PipelineService(state)
-        
+        # Daemon mode: build the pipeline once and serve requests
+        if args.daemon:
+            run_daemon(state, args.socket)
+            return
+
+        # Proxy through a running daemon when one answers; its models are
+        # already loaded so this skips the multi-second cold start
+        pipeline = None
+        results = None
+        if args.file:
+            results = dispatch_remote(args.socket, {
+                "command": "process_audio", "path": args.file, "formats": args.formats
+            })
+        elif args.directory:
+            results = dispatch_remote(args.socket, {
+                "command": "process_directory", "path": args.directory, "formats": args.formats
+            })
+
+        if results is None:
+            # Initialize pipeline in-process
+            pipeline = PipelineService(state)
+
         # Process based on input type
         if args.file:
             print(f"Processing audio file: {args.file}")
-            results = pipeline.process_audio(args.file, args.formats)
-            
+            if results is None:
+                results = pipeline.process_audio(args.file, args.formats)
+
         elif args.directory:
             print(f"Processing directory: {args.directory}")
-            results = pipeline.process_directory(args.directory, args.formats)
-            
+            if results is None:
+                results = pipeline.process_directory(args.directory, args.formats)
+
         elif args.base64:
             print("Processing Base64 encoded audio")
             results = pipeline.process_base64(
@@ -187,8 +309,9 @@ Examples:
             
             sys.exit(1)
         
-        # Cleanup
-        pipeline.cleanup()
+        # Cleanup (daemon-proxied runs clean up on the daemon side)
+        if pipeline is not None:
+            pipeline.cleanup()
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Processing interrupted by user")